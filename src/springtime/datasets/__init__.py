@@ -27,6 +27,9 @@ Datasets = Annotated[
     Field(discriminator="dataset"),
 ]
 
+# Building the validator for the union is expensive, so only do it once
+_dataset_loader = TypeAdapter(Datasets)
+
 
 def load_dataset(recipe: str) -> Datasets:
     """Load a dataset formatted as (yaml) recipe.
@@ -36,7 +39,5 @@ def load_dataset(recipe: str) -> Datasets:
 
     """
     model_dict = yaml.safe_load(recipe)
-
-    dataset_loader = TypeAdapter(Datasets)
-    dataset = dataset_loader.validate_python(model_dict)
+    dataset = _dataset_loader.validate_python(model_dict)
     return dataset  # type: ignore  # https://github.com/pydantic/pydantic/discussions/7094
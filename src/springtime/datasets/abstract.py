@@ -52,9 +52,12 @@ class Dataset(BaseModel, ABC, validate_default=True, validate_assignment=True):
         breaks the recipe. For example, don't convert to geopandas.
         """
 
-    def to_recipe(self):
-        """Print out a recipe to reproduce this dataset."""
-        recipe = self.model_dump(
+    def to_recipe_dict(self) -> dict:
+        """Return the recipe to reproduce this dataset as a dictionary."""
+        return self.model_dump(
             mode="json", exclude_none=True, exclude=["credential_file"]
         )
-        return yaml.dump(recipe, sort_keys=False)
+
+    def to_recipe(self):
+        """Print out a recipe to reproduce this dataset."""
+        return yaml.dump(self.to_recipe_dict(), sort_keys=False)
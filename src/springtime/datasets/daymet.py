@@ -82,6 +82,7 @@ from pathlib import Path
 from typing import Literal, Optional, Sequence, get_args
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 import xarray as xr
 from pydantic import field_validator, model_validator
@@ -96,6 +97,7 @@ from springtime.utils import (
     YearRange,
     resample,
     run_r_script,
+    run_r_scripts,
 )
 
 logger = logging.getLogger(__name__)
@@ -270,6 +272,7 @@ class Daymet(Dataset):
         dir.mkdir(exist_ok=True, parents=True)
 
         paths = []
+        scripts = []
         for variable, year in product(self.variables, self.years.range):
             path = self._box_path(variable, year)
 
@@ -277,12 +280,15 @@ class Daymet(Dataset):
                 logger.info(f"Found {path}")
             else:
                 logger.info(f"Downloading variable {variable} for year {year}")
-                # Download tests/recipes/daymet.yaml:daymet_bounding_box_all_variables
-                # took more than 30s so upped timeout
-                run_r_script(self._r_download_ncss(variable, year), timeout=120)
+                scripts.append(self._r_download_ncss(variable, year))
 
             paths.append(path)
 
+        # Download tests/recipes/daymet.yaml:daymet_bounding_box_all_variables
+        # took more than 30s so upped timeout. Only a few concurrent
+        # downloads, to go easy on the Daymet server.
+        run_r_scripts(scripts, timeout=120, max_workers=4)
+
         return paths
 
     def raw_load(self) -> xr.Dataset | gpd.GeoDataFrame:
@@ -310,7 +316,8 @@ class Daymet(Dataset):
         df = pd.read_csv(file, skiprows=6)
 
         # Add geometry since we want to batch read dataframes with different coords
-        geometry = gpd.points_from_xy([point.x] * len(df), [point.y] * len(df))
+        # Same point object on every row, created only once
+        geometry = gpd.points_from_xy([point.x], [point.y]).take(np.zeros(len(df), int))
         gdf = gpd.GeoDataFrame(df).set_geometry(geometry)
 
         # type checker is iffy
@@ -407,9 +414,12 @@ class Daymet(Dataset):
     def _resample_yday(self, gdf, frequency, operator) -> gpd.GeoDataFrame:
         """Resample a dataframe that has year and yday columns."""
 
-        gdf["datetime"] = pd.to_datetime(
-            gdf["year"] * 1000 + gdf["yday"], format="%Y%j"
-        )
+        # Date arithmetic on the arrays instead of parsing "%Y%j" strings
+        years = (gdf["year"].to_numpy() - 1970).astype("datetime64[Y]")
+        days = gdf["yday"].to_numpy() - 1
+        dates = years.astype("datetime64[D]") + days
+        # Nanoseconds, as parsing the dates with pandas gave before
+        gdf["datetime"] = pd.to_datetime(dates.astype("datetime64[ns]"))
         gdf = gdf.drop(columns=["year", "yday"])
 
         return resample(gdf, freq=frequency, operator=operator, column="datetime")
@@ -303,7 +303,11 @@ class EOBS(Dataset):
         return ds
 
     def load(self):
-        """Load and pre-process the data."""
+        """Load and pre-process the data.
+
+        Without points, the gridded data is returned as a dask-backed dataset,
+        so nothing is read from disk until it is computed.
+        """
         ds = self.raw_load()
 
         # Select time
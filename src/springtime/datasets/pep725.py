@@ -108,16 +108,14 @@ class PEP725Phenor(Dataset):
             df.rename(columns={"day": f"DOY {self.phenophase}"})
 
         if self.years:
-            years_set = set(self.years.range)
-            df = df[df["year"].isin(years_set)]
+            df = df[df["year"].isin(self.years.range)]
 
         # Convert to geodataframe, lat/lon to geometry
         points = geopandas.points_from_xy(df.pop("lon"), df.pop("lat"))
         gdf = geopandas.GeoDataFrame(data=df, geometry=points)
 
         if self.area:
-            bbox = self.area.bbox
-            gdf: geopandas.GeoDataFrame = gdf.cx[bbox[0] : bbox[2], bbox[1] : bbox[3]]
+            gdf: geopandas.GeoDataFrame = gdf[self.area.contains_mask(gdf.geometry)]
 
         if isinstance(self.include_cols, list):
             gdf: geopandas.GeoDataFrame = gdf[self.include_cols]
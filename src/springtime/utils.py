@@ -1,11 +1,22 @@
+import atexit
+import os
+import selectors
 import signal
 import subprocess
+import sys
+import tempfile
+import threading
 import time
-from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, singledispatch, wraps
 from logging import getLogger
-from typing import NamedTuple, Sequence
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional, Sequence
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
 import xarray as xr
 from pydantic import (
     BaseModel,
@@ -16,6 +27,11 @@ from pydantic import (
 )
 from shapely.geometry import Polygon
 
+try:
+    import flox
+except ImportError:
+    flox = None
+
 logger = getLogger(__name__)
 
 # TODO move the types to types.py
@@ -47,22 +63,26 @@ class PointsFromOther(BaseModel):
     """
 
     source: str
-    _xy: Sequence[Point] = PrivateAttr(default=[])
+    _x: np.ndarray = PrivateAttr(default_factory=lambda: np.empty(0))
+    _y: np.ndarray = PrivateAttr(default_factory=lambda: np.empty(0))
     _points: gpd.GeoSeries | None = PrivateAttr(default=None)
     _records: gpd.GeoSeries | None = PrivateAttr(default=None)
 
     def get_points(self, other):
         # TODO: refactor to generic utility function
-        self._xy = list(map(lambda p: Point(p.x, p.y), other.geometry.unique()))
-        self._points = other.geometry.unique()
+        unique_points = other.geometry.unique()
+        points = np.asarray(unique_points)
+        self._x = shapely.get_x(points)
+        self._y = shapely.get_y(points)
+        self._points = unique_points
         self._records = other[["year", "geometry"]]
 
     def __iter__(self):
-        for item in self._xy:
-            yield item
+        for x, y in zip(self._x.tolist(), self._y.tolist()):
+            yield Point(x, y)
 
     def __len__(self):
-        return len(self._xy)
+        return len(self._x)
 
 
 Points = Sequence[Point] | PointsFromOther
@@ -77,12 +97,15 @@ class BoundingBox(NamedTuple):
 
     @classmethod
     def from_points(cls, points: Points):
-        return cls(
-            xmin=min(map(lambda p: p.x, points)),
-            ymin=min(map(lambda p: p.y, points)),
-            xmax=max(map(lambda p: p.x, points)),
-            ymax=max(map(lambda p: p.y, points)),
-        )
+        xy = _points_to_array(points)
+        xmin, ymin = xy.min(axis=0).tolist()
+        xmax, ymax = xy.max(axis=0).tolist()
+        return cls(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+
+
+_BBOX_LOWER = np.array([-180, 0, -180, 0])
+_BBOX_UPPER = np.array([180, 90, 180, 90])
+"""Exclusive limits of (xmin, ymin, xmax, ymax) of a NamedArea."""
 
 
 class NamedArea(BaseModel):
@@ -95,16 +118,39 @@ class NamedArea(BaseModel):
 
     @field_validator("bbox")
     def _parse_bbox(cls, values):
-        xmin, ymin, xmax, ymax = values
-        assert xmax > xmin, "xmax should be larger than xmin"
-        assert ymax > ymin, "ymax should be larger than ymin"
-        assert ymax < 90 and ymin > 0, "Latitudes should be in [0, 90]"
-        assert xmin > -180 and xmax < 180, "Longitudes should be in [-180, 180]."
+        bbox = np.asarray(values, dtype=float)
+        x_increases, y_increases = bbox[2:] > bbox[:2]
+        in_range = (bbox > _BBOX_LOWER) & (bbox < _BBOX_UPPER)
+        if not x_increases:
+            raise ValueError("xmax should be larger than xmin")
+        if not y_increases:
+            raise ValueError("ymax should be larger than ymin")
+        if not in_range[1::2].all():
+            raise ValueError("Latitudes should be in [0, 90]")
+        if not in_range[::2].all():
+            raise ValueError("Longitudes should be in [-180, 180]")
         return values
 
     @property
     def polygon(self):
-        return Polygon.from_bounds(*self.bbox)
+        # Cached by bbox rather than on the instance, so it follows changes
+        # to bbox, also those made by model_copy(update=...)
+        return _bbox_polygon(BoundingBox(*self.bbox))
+
+    def contains_mask(self, geoms: gpd.GeoSeries) -> np.ndarray:
+        """Return boolean mask of geometries that lie within the area.
+
+        Geometries on the boundary of the area are included.
+        """
+        return shapely.covers(self.polygon, np.asarray(geoms.values))
+
+
+@lru_cache
+def _bbox_polygon(bbox: BoundingBox) -> Polygon:
+    """Return polygon of bbox, prepared to speed up repeated predicates."""
+    polygon = Polygon.from_bounds(*bbox)
+    shapely.prepare(polygon)
+    return polygon
 
 
 class NamedIdentifiers(BaseModel):
@@ -123,7 +169,7 @@ class YearRange(NamedTuple):
         >>> YearRange(2000, 2005)
         YearRange(start=2000, end=2005)
         >>> YearRange(start=2000, end=2005).range
-        range(2000, 2006)
+        array([2000, 2001, 2002, 2003, 2004, 2005], dtype=int16)
         >>> YearRange(2000, 2000)
         YearRange(start=2000, end=2000)
 
@@ -141,16 +187,30 @@ class YearRange(NamedTuple):
         return self
 
     @property
-    def range(self) -> range:
-        """Return the range of years."""
-        # +1 as range() is exclusive while YearRange is inclusive
-        return range(self.start, self.end + 1)
+    def range(self) -> np.ndarray:
+        """Return the range of years.
+
+        The array is built once per (start, end) and shared by all instances,
+        so it is read-only.
+        """
+        return _years(self.start, self.end)
+
+
+@lru_cache
+def _years(start: int, end: int) -> np.ndarray:
+    """Return read-only array of years from start to end (inclusive)."""
+    # +1 as arange() is exclusive while YearRange is inclusive
+    years = np.arange(start, end + 1, dtype=np.int16)
+    years.flags.writeable = False
+    return years
 
 
 # Decorators copied from https://wiki.python.org/moin/PythonDecoratorLibrary
 
 
-def retry(timeout: int = 10, max_tries: int = 3, delay: int = 1, backoff: int = 2):
+def retry(
+    timeout: float = 10, max_tries: int = 3, delay: float = 1, backoff: float = 2
+):
     """Decorator to retry function with timeout.
 
     The decorator will call the function up to max_tries times if it raises
@@ -160,6 +220,10 @@ def retry(timeout: int = 10, max_tries: int = 3, delay: int = 1, backoff: int =
         Decorating function which calls rpy2 does not work. Please use
         :func:run_r_script method instead.
 
+    Note:
+        The timeout is implemented with a SIGALRM interval timer, so decorated
+        functions can only be called from the main thread.
+
     Args:
         timeout: Maximum mumber of seconds the function may take.
         max_tries: Maximum number of times to execute the function.
@@ -178,11 +242,10 @@ def retry(timeout: int = 10, max_tries: int = 3, delay: int = 1, backoff: int =
         @wraps(function)
         def f2(*args, **kwargs):
             mydelay = delay
-            tries = list(range(max_tries))
-            tries.reverse()
-            for tries_remaining in tries:
-                oldsignal = signal.signal(signal.SIGALRM, _handle_timeout)
-                signal.alarm(timeout)
+            set_signal, set_timer = signal.signal, signal.setitimer
+            for tries_remaining in range(max_tries - 1, -1, -1):
+                oldsignal = set_signal(signal.SIGALRM, _handle_timeout)
+                set_timer(signal.ITIMER_REAL, timeout)
                 try:
                     return function(*args, **kwargs)
                 except TimeoutError:
@@ -197,8 +260,8 @@ def retry(timeout: int = 10, max_tries: int = 3, delay: int = 1, backoff: int =
                 else:
                     break
                 finally:
-                    signal.alarm(0)
-                    signal.signal(signal.SIGALRM, oldsignal)
+                    set_timer(signal.ITIMER_REAL, 0)
+                    set_signal(signal.SIGALRM, oldsignal)
 
         return f2
 
@@ -215,26 +278,257 @@ class TimeoutError(Exception):
     pass
 
 
+_R_COMMAND = ["R", "--vanilla", "--no-echo"]
+_R_SENTINEL = b"<<<DONE>>>"
+_R_STDERR_TAIL = 64 * 1024
+"""Maximum number of bytes of stderr reported for a failed script."""
+
+
+class _RWorkerExited(Exception):
+    """The R process of a worker exited while running a script."""
+
+    def __init__(self, returncode: int, stderr: str):
+        super().__init__("R worker exited unexpectedly")
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+def _r_string(value: str) -> str:
+    """Quote value as an R string literal."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class _RWorker:
+    """Long-lived R process that sources the scripts sent to it.
+
+    Each script is sourced in a fresh environment with the working directory
+    of the Python process, but other R state (attached packages, options(),
+    global variables) carries over to the next script run by the worker.
+
+    Its stderr goes to a temporary file that is reused for every script.
+    """
+
+    def __init__(self):
+        logger.debug("Starting R worker")
+        self.stderr: BinaryIO = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            _R_COMMAND,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self.stderr,
+            bufsize=0,
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self):
+        """Terminate the R process."""
+        self.process.terminate()
+        self.process.wait()
+        self.stderr.close()
+
+    def run(self, script_path: Path, timeout: float) -> tuple[int, str]:
+        """Source an R script and wait for it to finish.
+
+        Output on stdout is relayed, stderr is collected on disk and only read
+        back when the script failed.
+
+        Returns:
+            Tuple of exit status (0 on success, 1 on R error) and the tail of
+            the captured stderr (empty on success).
+
+        Raises:
+            TimeoutError: When the script did not finish within timeout seconds.
+            _RWorkerExited: When the R process exited, e.g. as the script
+                called quit() or crashed R.
+        """
+        deadline = time.monotonic() + timeout
+        stdin, stdout_pipe = self.process.stdin, self.process.stdout
+        assert stdin and stdout_pipe  # type narrowing
+        sentinel = _R_SENTINEL.decode()
+        # Relative paths in the script should resolve like they would in a
+        # fresh R process started by us, so follow our working directory.
+        command = (
+            f"tryCatch({{setwd({_r_string(os.getcwd())}); "
+            f"source({_r_string(script_path.as_posix())}, "
+            'local=new.env(), encoding="UTF-8"); '
+            f'cat("{sentinel}0\\n")}}, '
+            "error=function(e) {message(conditionMessage(e)); "
+            f'cat("{sentinel}1\\n")}}); '
+            # Not interactive, so R does not flush its output by itself
+            "flush.console()\n"
+        )
+
+        # The process shares the file offset, so rewinding also makes it
+        # overwrite the stderr of the previous script.
+        self.stderr.seek(0)
+        self.stderr.truncate()
+
+        try:
+            stdin.write(command.encode())
+        except BrokenPipeError:
+            raise self._exited() from None
+
+        stdout = b""
+        with selectors.DefaultSelector() as selector:
+            selector.register(stdout_pipe, selectors.EVENT_READ)
+            while True:
+                if not selector.select(timeout=deadline - time.monotonic()):
+                    raise TimeoutError("R script timed out")
+                chunk = os.read(stdout_pipe.fileno(), 65536)
+                if not chunk:
+                    raise self._exited()
+
+                stdout += chunk
+                done = stdout.find(_R_SENTINEL)
+                if done == -1:
+                    # Relay output, keeping a possibly partial sentinel
+                    keep = len(_R_SENTINEL) + 1
+                    sys.stdout.write(stdout[:-keep].decode(errors="replace"))
+                    stdout = stdout[-keep:]
+                elif stdout.endswith(b"\n"):
+                    sys.stdout.write(stdout[:done].decode(errors="replace"))
+                    sys.stdout.flush()
+                    status = int(stdout[done + len(_R_SENTINEL) :].strip())
+                    return status, self._read_stderr() if status else ""
+
+    def _exited(self) -> _RWorkerExited:
+        """Describe the exit of the R process, including its last stderr."""
+        return _RWorkerExited(self.process.wait(), self._read_stderr())
+
+    def _read_stderr(self) -> str:
+        """Return the last part of the stderr of the last script."""
+        size = self.stderr.seek(0, os.SEEK_END)
+        self.stderr.seek(max(size - _R_STDERR_TAIL, 0))
+        return self.stderr.read().decode(errors="replace")
+
+
+_R_IDLE_WORKERS: list[_RWorker] = []
+"""R processes not running a script, reused by :func:run_r_script."""
+_R_MAX_IDLE_WORKERS = 2
+"""Workers beyond this many are stopped once they are done."""
+_R_WORKERS_LOCK = threading.Lock()
+
+
+def _run_in_r_worker(script_path: Path, timeout: float) -> tuple[int, str]:
+    """Run an R script in an idle R worker, starting one if none is idle."""
+    worker = None
+    with _R_WORKERS_LOCK:
+        while _R_IDLE_WORKERS and worker is None:
+            worker = _R_IDLE_WORKERS.pop()
+            if not worker.alive():
+                worker.stop()
+                worker = None
+    if worker is None:
+        worker = _RWorker()
+
+    try:
+        result = worker.run(script_path, timeout)
+    except BaseException:
+        # Worker is in an unknown state (e.g. timed out mid-script)
+        worker.stop()
+        raise
+
+    with _R_WORKERS_LOCK:
+        if len(_R_IDLE_WORKERS) < _R_MAX_IDLE_WORKERS:
+            _R_IDLE_WORKERS.append(worker)
+            worker = None
+    if worker is not None:
+        worker.stop()
+    return result
+
+
+def _stop_r_workers():
+    """Terminate all idle R processes."""
+    with _R_WORKERS_LOCK:
+        while _R_IDLE_WORKERS:
+            _R_IDLE_WORKERS.pop().stop()
+
+
+atexit.register(_stop_r_workers)
+
+
 def run_r_script(script: str, timeout: int = 30, max_tries: int = 3):
     """Run R script with retries and timeout logic.
 
+    Scripts are executed in long-lived R processes, so the R startup cost is
+    only paid once per Python session (or once per thread running scripts
+    concurrently). Scripts run in the current working directory, but other R
+    state such as attached packages and options() is kept between scripts.
+
     Args:
         script: The R script to run
         timeout: Maximum mumber of seconds the function may take.
         max_tries: Maximum number of times to execute the function.
+
+    Raises:
+        TimeoutError: When the last try timed out.
+        subprocess.CalledProcessError: When the script raised an error, or R
+            exited during the last try.
     """
     logger.debug(f"Executing R code:\n{script}")
 
-    result = retry(timeout=timeout, max_tries=max_tries)(subprocess.run)(
-        ["R", "--vanilla", "--no-echo"],
-        input=script.encode(),
-        stderr=subprocess.PIPE,
-    )
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".R", encoding="utf-8", delete=False
+    ) as f:
+        f.write(script)
+    script_path = Path(f.name)
+
+    # Not using the retry decorator as its SIGALRM timeout only works in the
+    # main thread; waiting on the worker output can time out by itself.
+    delay = 1
     try:
-        result.check_returncode()
-    except subprocess.CalledProcessError:
-        logger.error(result.stderr)
-        raise
+        for tries_remaining in range(max_tries - 1, -1, -1):
+            try:
+                status, stderr = _run_in_r_worker(script_path, timeout)
+                break
+            except TimeoutError:
+                if tries_remaining == 0:
+                    raise
+                logger.warning(f"R script took more than {timeout} seconds, retrying")
+            except _RWorkerExited as e:
+                # quit() with status 0 is still not a completed script
+                status, stderr = e.returncode or 1, e.stderr
+                if tries_remaining == 0:
+                    break
+                logger.warning("R exited while running script, retrying")
+            time.sleep(delay)
+            delay *= 2
+    finally:
+        script_path.unlink()
+
+    if status != 0:
+        logger.error(stderr)
+        raise subprocess.CalledProcessError(status, _R_COMMAND, stderr=stderr)
+
+
+def run_r_scripts(
+    scripts: Sequence[str],
+    timeout: int = 30,
+    max_tries: int = 3,
+    max_workers: Optional[int] = None,
+):
+    """Run independent R scripts concurrently.
+
+    Each script is run with :func:run_r_script in a thread pool, so up to
+    max_workers R processes are busy at the same time. Only a few of them are
+    kept around for later scripts.
+
+    Args:
+        scripts: The R scripts to run
+        timeout: Maximum mumber of seconds each script may take.
+        max_tries: Maximum number of times to execute each script.
+        max_workers: Maximum number of scripts to run at the same time.
+            Defaults to the number of CPUs.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(run_r_script, script, timeout, max_tries) for script in scripts
+        ]
+        # Raises the first failure, after all scripts have finished
+        for future in futures:
+            future.result()
 
 
 def transponse_df(df, index=("year", "geometry"), columns=("doy",)):
@@ -271,10 +565,65 @@ def transponse_df(df, index=("year", "geometry"), columns=("doy",)):
         "Wide form" data frame with year and geometry column and
         columns named `<original column name>_<doy>`.
     """
+    if tuple(index) == ("year", "geometry") and tuple(columns) == ("doy",):
+        values = df.columns.drop(["year", "geometry", "doy"])
+        if isinstance(df["geometry"].dtype, gpd.array.GeometryDtype) and all(
+            _is_plain_numeric(df[name]) for name in values
+        ):
+            return _transpose_doy(df, values)
+
     pdf = df.pivot(index=index, columns=columns).reset_index()
-    pdf.columns = [
-        "_".join(map(str, filter(lambda x: x != "", i))) for i in pdf.columns.values
-    ]
+    names = pdf.columns.get_level_values(0).astype(str)
+    for level in range(1, pdf.columns.nlevels):
+        suffix = pdf.columns.get_level_values(level).astype(str)
+        names = names.where(suffix == "", names + "_" + suffix)
+    pdf.columns = names.tolist()
+    return gpd.GeoDataFrame(pdf)
+
+
+def _is_plain_numeric(series: pd.Series) -> bool:
+    """Tell if series is backed by an integer or float numpy array."""
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf"
+
+
+def _transpose_doy(df, values):
+    """Fast path of :func:transponse_df for year/geometry records and doy.
+
+    Scatters the values directly into a dense (records x doy) array instead
+    of going through the generic pivot. The rows and dtypes are the same as
+    those of the pivot.
+    """
+    # Sorting the geometry array itself gives the same order as the pivot
+    geom_codes = pd.factorize(df["geometry"].array, sort=True)[0]
+    keys = pd.MultiIndex.from_arrays([df["year"].to_numpy(), geom_codes])
+    record, records = pd.factorize(keys, sort=True)
+    doys, doy = np.unique(df["doy"].to_numpy(), return_inverse=True)
+    shape = (len(records), len(doys))
+
+    cell = np.ravel_multi_index((record, doy), shape)
+    if len(np.unique(cell)) != len(cell):
+        raise ValueError("Index contains duplicate entries, cannot reshape")
+    complete = len(cell) == shape[0] * shape[1]
+
+    first = np.empty(len(records), dtype=int)
+    first[record[::-1]] = np.arange(len(df))[::-1]
+    pdf = df.iloc[first][["year", "geometry"]].reset_index(drop=True)
+
+    doy_labels = "_" + pd.Index(doys).astype(str)
+    columns = {}
+    for name in values:
+        column = df[name].to_numpy()
+        if complete:
+            wide = np.empty(shape, dtype=column.dtype)
+        else:
+            # Like the pivot, integers become float64 to hold the NaNs
+            dtype = column.dtype if column.dtype.kind == "f" else np.float64
+            wide = np.full(shape, np.nan, dtype=dtype)
+        wide[record, doy] = column
+        labels = (str(name) + doy_labels).tolist()
+        columns.update(zip(labels, wide.T))
+
+    pdf = pd.concat([pdf, pd.DataFrame(columns)], axis=1)
     return gpd.GeoDataFrame(pdf)
 
 
@@ -286,9 +635,49 @@ def rolling_mean(
 ):
     """Group by `groupby` columns and calculate rolling mean
     for `over` columns with different window sizes.
+
+    Rows are assumed to be in chronological order within each group. For
+    each window size, the mean over consecutive, non-overlapping windows is
+    stored in columns named `<original column name>_<size>_<window index>`.
+    Incomplete windows at the end of a group are dropped and missing values
+    are ignored.
+
+    Returns:
+        "Wide form" data frame with one row per group.
     """
-    # TODO implement
-    raise NotImplementedError()
+    groupby = list(groupby)
+    grouped = df.groupby(groupby, sort=False)
+    group = grouped.ngroup().to_numpy()
+    # Like groupby, drop rows with a missing group key (group -1 or NaN)
+    order = np.flatnonzero(group >= 0)
+    order = order[np.argsort(group[order], kind="stable")]
+    group = group[order].astype(int)
+    position = grouped.cumcount().to_numpy()[order].astype(int)
+
+    first = order[position == 0]
+    records = df.iloc[first][groupby].reset_index(drop=True)
+
+    columns = {}
+    for name in over:
+        values = df[name].to_numpy(dtype=float)[order]
+        valid = ~np.isnan(values)
+        # Running sums over all groups at once; a window never crosses a group
+        # boundary because only windows ending at a multiple of size are used.
+        sums = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0))])
+        counts = np.concatenate([[0], np.cumsum(valid)])
+        for size in window_sizes:
+            end = np.flatnonzero((position + 1) % size == 0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = (sums[end + 1] - sums[end + 1 - size]) / (
+                    counts[end + 1] - counts[end + 1 - size]
+                )
+            window = position[end] // size
+            wide = np.full((len(records), window.max(initial=-1) + 1), np.nan)
+            wide[group[end], window] = means
+            for index, column in enumerate(wide.T):
+                columns[f"{name}_{size}_{index}"] = column
+
+    return pd.concat([records, pd.DataFrame(columns)], axis=1)
 
 
 class ResampleConfig(BaseModel):
@@ -304,6 +693,16 @@ class ResampleConfig(BaseModel):
     for allowed values."""
 
 
+# pandas operators that can be delegated to flox; the nan-variants match
+# pandas' default of skipping missing values.
+_FLOX_OPERATORS = {
+    "mean": "nanmean",
+    "sum": "nansum",
+    "min": "nanmin",
+    "max": "nanmax",
+}
+
+
 def resample(df, freq="month", operator="mean", column="datetime"):
     """Resample data on year, geometry, and given frequency.
 
@@ -313,17 +712,33 @@ def resample(df, freq="month", operator="mean", column="datetime"):
     - 'day'
     - 'dayofyear'
     - ...
+
+    If [flox](https://flox.readthedocs.io/) is installed, it is used for the
+    mean, sum, min and max operators.
     """
-    groups = [
-        "geometry",
-        getattr(df[column].dt, "year").rename("year"),
-        getattr(df[column].dt, freq).rename(freq),
-    ]
+    geom_codes, geometries = df["geometry"].values.factorize()
+    year = getattr(df[column].dt, "year").rename("year")
+    period = getattr(df[column].dt, freq).rename(freq)
 
-    # Can't sort when grouping on geometry
-    new_df = (
-        df.groupby(groups, sort=False).agg(operator, numeric_only=True).reset_index()
-    )
+    if flox is not None and operator in _FLOX_OPERATORS and len(df):
+        new_df = _groupby_reduce_flox(
+            df, geom_codes, year, period, _FLOX_OPERATORS[operator]
+        )
+    else:
+        # Group on categorical codes of the unique geometries rather than on
+        # the geometry objects themselves; observed=True avoids expanding to
+        # the cartesian product of all categories.
+        geom_key = pd.Categorical.from_codes(
+            geom_codes, categories=np.arange(len(geometries))
+        )
+        groups = [pd.Series(geom_key, index=df.index, name="geometry"), year, period]
+        new_df = (
+            df.drop(columns="geometry")
+            .groupby(groups, observed=True, sort=False)
+            .agg(operator, numeric_only=True)
+            .reset_index()
+        )
+    new_df["geometry"] = geometries.take(new_df["geometry"].to_numpy(dtype=int))
 
     # TODO: could this make the frequency more flexible?
     # https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
@@ -334,6 +749,46 @@ def resample(df, freq="month", operator="mean", column="datetime"):
     return gpd.GeoDataFrame(new_df)
 
 
+def _groupby_reduce_flox(df, geom_codes, year, period, func):
+    """Aggregate numeric columns of df per geometry code, year and period.
+
+    Equivalent of the pandas groupby in :func:resample, but using flox.
+    """
+    keys = pd.DataFrame(
+        {
+            "geometry": geom_codes,
+            year.name: year.to_numpy(),
+            period.name: period.to_numpy(),
+        }
+    )
+    valid = (geom_codes >= 0) & keys.notna().all(axis=1).to_numpy()
+    group_codes, groups = pd.factorize(pd.MultiIndex.from_frame(keys[valid]))
+
+    # Same columns as numeric_only=True in pandas, which includes booleans
+    values = df.select_dtypes(["number", "bool"])[valid]
+    result, _ = flox.groupby_reduce(
+        values.to_numpy(dtype=float).T,
+        group_codes,
+        func=func,
+        expected_groups=np.arange(len(groups)),
+    )
+
+    # Match the result dtypes of pandas, flox returns floats for integer input
+    aggregated = pd.DataFrame(result.T, columns=values.columns)
+    if func == "nansum":
+        aggregated = aggregated.astype(
+            {
+                name: np.int64 if dtype == bool else dtype
+                for name, dtype in values.dtypes.items()
+            }
+        )
+    elif func in ("nanmin", "nanmax"):
+        aggregated = aggregated.astype(values.dtypes.to_dict())
+    groups = groups.to_frame(index=False, name=keys.columns.tolist())
+    groups = groups.astype(keys.dtypes.to_dict())
+    return pd.concat([groups, aggregated], axis=1)
+
+
 def points_from_cube(
     ds: xr.Dataset,
     points: Points,
@@ -350,47 +805,70 @@ def points_from_cube(
         Dataframe with columns for each point and each variable in the dataset.
         The points are in the geometry column.
     """
-    lons = xr.DataArray([p[0] for p in points], dims="points_index")
-    lats = xr.DataArray([p[1] for p in points], dims="points_index")
-    points_df = gpd.GeoDataFrame(geometry=gpd.points_from_xy(lons, lats)).reset_index(
-        names="points_index"
+    xy = _points_to_array(points)
+    lons = xr.DataArray(xy[:, 0], dims="points_index")
+    lats = xr.DataArray(xy[:, 1], dims="points_index")
+    selected = ds.sel(
+        **{xdim: lons, ydim: lats, "method": "nearest"}  # type: ignore
+    ).drop_vars([xdim, ydim])
+
+    # One row per point and per combination of the remaining dimensions, so
+    # rows are ordered by points first.
+    other_dims = [dim for dim in selected.dims if dim != "points_index"]
+    dims = ["points_index", *other_dims]
+    variables = [name for name in selected.variables if name not in selected.dims]
+    columns = {}
+    for name in [*other_dims, *variables]:
+        values = selected[name].broadcast_like(selected).transpose(*dims).values
+        columns[name] = values.ravel()
+    df = pd.DataFrame(columns)
+    repeats = len(df) // len(xy) if len(xy) else 0
+    geometry = gpd.points_from_xy(xy[:, 0], xy[:, 1]).take(
+        np.repeat(np.arange(len(xy)), repeats)
     )
-    df = (
-        ds.sel(**{xdim: lons, ydim: lats, "method": "nearest"})  # type: ignore
-        .to_dataframe()
-        .reset_index()
-    )
-    df = df.merge(points_df, on="points_index", how="right").drop(
-        ["points_index", xdim, ydim], axis=1
-    )
-    return gpd.GeoDataFrame(df, geometry=df.geometry)
+    return gpd.GeoDataFrame(df, geometry=geometry)
+
+
+def _points_to_array(points: Points) -> np.ndarray:
+    """Return points as (n, 2) array of x and y coordinates."""
+    if isinstance(points, PointsFromOther):
+        return np.column_stack([points._x, points._y])
+    return np.asarray(points, dtype=float).reshape(-1, 2)
 
 
 # TODO merge with points_from_cube from above?
+@singledispatch
 def get_points_from_raster(points: Point | Points, ds: xr.Dataset) -> xr.Dataset:
     """Extract points from area."""
-    if isinstance(points, Point):
-        x = [points.x]
-        y = [points.y]
-        geometry = gpd.GeoSeries(gpd.points_from_xy(x, y), name="geometry")
-        ds = extract_points(ds, geometry)
-    elif isinstance(points, Sequence):
-        x = [p.x for p in points]  # type: ignore  # Mypy struggles in CI
-        y = [p.y for p in points]  # type: ignore  # Mypy struggles in CI
-        geometry = gpd.GeoSeries(gpd.points_from_xy(x, y), name="geometry")
-        ds = extract_points(ds, geometry)
-    else:
-        # only remaining option is PointsFromOther
-        records = points._records
-        ds = extract_records(ds, records)
-    return ds
+    raise TypeError(f"Can not extract points of type {type(points).__name__}")
+
+
+@get_points_from_raster.register
+def _(points: Point, ds: xr.Dataset) -> xr.Dataset:
+    return extract_points(ds, gpd.points_from_xy([points.x], [points.y]))
 
 
-def extract_points(ds, points: gpd.GeoSeries, method="nearest"):
+@get_points_from_raster.register(list)
+@get_points_from_raster.register(tuple)
+def _(points: Sequence[Point], ds: xr.Dataset) -> xr.Dataset:
+    xy = _points_to_array(points)
+    return extract_points(ds, gpd.points_from_xy(xy[:, 0], xy[:, 1]))
+
+
+@get_points_from_raster.register
+def _(points: PointsFromOther, ds: xr.Dataset) -> xr.Dataset:
+    return extract_records(ds, points._records)
+
+
+def extract_points(
+    ds, points: gpd.GeoSeries | gpd.array.GeometryArray, method="nearest"
+):
     """Extract list of points from gridded dataset."""
-    x = xr.DataArray(points.unique().x, dims=["geometry"])
-    y = xr.DataArray(points.unique().y, dims=["geometry"])
-    geometry = xr.DataArray(points.unique(), dims=["geometry"])
+    unique_points = points.unique()
+    geometries = np.asarray(unique_points)
+    x = xr.DataArray(shapely.get_x(geometries), dims=["geometry"])
+    y = xr.DataArray(shapely.get_y(geometries), dims=["geometry"])
+    geometry = xr.DataArray(unique_points, dims=["geometry"])
     return (
         ds.sel(longitude=x, latitude=y, method=method)
         .drop_vars(["latitude", "longitude"])
@@ -400,10 +878,14 @@ def extract_points(ds, points: gpd.GeoSeries, method="nearest"):
 
 def extract_records(ds, records: gpd.GeoDataFrame):
     """Extract list of year/geometry records from gridded dataset."""
-    x = records.geometry.x.to_xarray()
-    y = records.geometry.y.to_xarray()
-    year = records.year.to_xarray()
-    geometry = records.geometry.to_xarray()
+    # Same dimension and coordinate as pd.Series.to_xarray() would give
+    dim = records.index.name or "index"
+    coords = {dim: records.index.to_numpy()}
+    geometries = np.asarray(records.geometry.values)
+    x = xr.DataArray(shapely.get_x(geometries), dims=dim, coords=coords)
+    y = xr.DataArray(shapely.get_y(geometries), dims=dim, coords=coords)
+    year = xr.DataArray(records.year.to_numpy(), dims=dim, coords=coords)
+    geometry = xr.DataArray(geometries, dims=dim, coords=coords)
     # TODO ensure all years present before allowing 'nearest' on year
     # TODO also work when there is no year column (static variables)?
     return (
@@ -413,41 +895,107 @@ def extract_records(ds, records: gpd.GeoDataFrame):
     )
 
 
-def join_dataframes(dfs, index_cols=["year", "geometry"]):
+def join_dataframes(dfs, index_cols=("year", "geometry")):
     """Join dataframes by index cols.
 
     Assumes incoming data is a geopandas dataframe with a geometry column. Not
-    as index.
-    """
-    others = []
-    for df in dfs:
-        df = gpd.GeoDataFrame(df)  # TODO should not be necessary
-        df = df.to_wkt()
-        df.set_index(index_cols, inplace=True)
-        others.append(df)
+    as index. Geometries are matched after rounding their coordinates to 6
+    decimals, like in their (default) WKT representation.
 
+    The rows are sorted by year and then by the order in which the geometries
+    first appear in dfs.
+    """
+    index_cols = list(index_cols)
+    dfs = [pd.DataFrame(df) for df in dfs]
+    geometries = _round_coordinates(
+        np.concatenate([np.asarray(df["geometry"].values) for df in dfs])
+    )
+    # Join on integer codes of the unique (rounded) geometries; missing
+    # geometries get a code of their own rather than the -1 sentinel
+    codes, _ = pd.factorize(shapely.to_wkb(geometries), use_na_sentinel=False)
+    # Codes number the geometries in order of first appearance
+    first = np.flatnonzero(~pd.Series(codes).duplicated().to_numpy())
+    offsets = np.cumsum([len(df) for df in dfs])[:-1]
+
+    others = [
+        df.assign(geometry=df_codes).set_index(index_cols)
+        for df, df_codes in zip(dfs, np.split(codes, offsets))
+    ]
     main_df = others.pop(0)
 
-    df = main_df.join(others, how="outer")
+    df = main_df.join(others, how="outer").sort_index()
     df.reset_index(inplace=True)
-    geometry = gpd.GeoSeries.from_wkt(df.pop("geometry"))
+    geometry = geometries[first][df.pop("geometry").to_numpy()]
 
     return gpd.GeoDataFrame(df, geometry=geometry).set_index(index_cols)
 
 
+def _round_coordinates(geometries: np.ndarray, decimals: int = 6) -> np.ndarray:
+    """Round coordinates of geometries, keeping z of 3D geometries."""
+    rounded = geometries.copy()
+    has_z = shapely.has_z(geometries)
+    for mask, include_z in ((~has_z, False), (has_z, True)):
+        rounded[mask] = shapely.transform(
+            geometries[mask],
+            lambda coords: coords.round(decimals),
+            include_z=include_z,
+        )
+    return rounded
+
+
 def split_time(ds, freq="daily"):
     """Split datetime coordinate into year and dayofyear or month."""
-    year = ds.time.dt.year.data
+    # Index is already decoded (DatetimeIndex or CFTimeIndex)
+    time = ds.indexes["time"]
+    year = np.asarray(time.year)
 
     if freq in ["daily", "day", "D"]:
-        freqdim = ds.time.dt.dayofyear.data
+        freqdim = np.asarray(time.dayofyear)
     elif freq in ["monthly", "month", "M"]:
-        freqdim = ds.time.dt.month.data
+        freqdim = np.asarray(time.month)
     else:
         raise ValueError("Unknown frequency. Choose daily or monthly.")
 
+    years = np.unique(year)
+    steps = np.unique(freqdim)
+    if (
+        len(year) == len(years) * len(steps)
+        and np.array_equal(year, np.repeat(years, len(steps)))
+        and np.array_equal(freqdim, np.tile(steps, len(years)))
+    ):
+        return _reshape_time(ds, years, steps)
+
     return (
         ds.assign_coords(year=("time", year), timeinyear=("time", freqdim))
         .set_index(time=("year", "timeinyear"))
         .unstack("time")
     )
+
+
+def _reshape_time(ds, years, steps):
+    """Fast path of :func:split_time for a complete, sorted year x step grid.
+
+    Reshapes the time axis of each variable instead of unstacking a
+    MultiIndex. Like unstack, the new dimensions are placed last.
+    """
+
+    def reshape(variable):
+        if "time" not in variable.dims:
+            return variable
+        variable = variable.transpose(..., "time")
+        return xr.Variable(
+            (*variable.dims[:-1], "year", "timeinyear"),
+            variable.data.reshape(*variable.shape[:-1], len(years), len(steps)),
+            variable.attrs,
+            variable.encoding,
+        )
+
+    coords = {
+        name: reshape(coord.variable)
+        for name, coord in ds.coords.items()
+        if name != "time"
+    }
+    coords["year"] = ("year", years)
+    coords["timeinyear"] = ("timeinyear", steps)
+    data_vars = {name: reshape(var.variable) for name, var in ds.data_vars.items()}
+    return xr.Dataset(data_vars, coords=coords, attrs=ds.attrs)
@@ -1,5 +1,11 @@
 from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
 
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
 import pytest
 
 from springtime.config import CONFIG
@@ -12,21 +18,95 @@ CONFIG.cache_dir = TEST_CACHE  # type: ignore  # pydantic will parse str to path
 ### Temporarily change the cache dir for regression tests
 
 
-@pytest.fixture
-def temporary_cache_dir(tmp_path):
-    """Temporarily change the cache dir in config."""
+@pytest.fixture(scope="session")
+def temporary_cache_dir(tmp_path_factory):
+    """Temporarily change the cache dir in config.
+
+    The temporary cache dir is shared by all tests in the session, so data is
+    downloaded at most once per session.
+    """
+    cache_dir = tmp_path_factory.mktemp("downloads", numbered=False)
 
     @contextmanager
     def context_manager():
-        global CONFIG_DIR
         old_cache_dir = CONFIG.cache_dir
-        CONFIG.cache_dir = tmp_path
-        yield
-        CONFIG.cache_dir = old_cache_dir
+        CONFIG.cache_dir = cache_dir
+        try:
+            yield
+        finally:
+            CONFIG.cache_dir = old_cache_dir
 
     return context_manager
 
 
+### Reference data, read once per session
+
+
+@lru_cache(maxsize=None)
+def _read_reference(
+    path: Path, mtime_ns: int, columns: tuple[str, ...] | None
+) -> gpd.GeoDataFrame:
+    # mtime_ns is only part of the cache key, so updated files are reread
+    return gpd.read_parquet(
+        path, columns=None if columns is None else list(columns), memory_map=True
+    )
+
+
+@lru_cache(maxsize=None)
+def _reference_columns(path: Path, mtime_ns: int) -> pd.Index:
+    # Read from the parquet schema, without reading any data
+    schema = pq.read_schema(path)
+    # Stored index levels are named columns, a RangeIndex is a dict
+    index_columns = schema.pandas_metadata["index_columns"]
+    stored = [name for name in index_columns if isinstance(name, str)]
+    return pd.Index(schema.names).difference(stored, sort=False)
+
+
+@pytest.fixture(scope="session")
+def load_reference():
+    """Return function that reads (cached) reference data from a parquet file.
+
+    If columns are given, asserts that the reference has exactly those columns
+    and only reads them from the file.
+    """
+
+    def load(path, columns=None) -> gpd.GeoDataFrame:
+        path = Path(path)
+        mtime_ns = path.stat().st_mtime_ns
+        if columns is not None:
+            diff = pd.Index(columns).symmetric_difference(
+                _reference_columns(path, mtime_ns)
+            )
+            assert diff.empty, f"Columns differ from reference: {diff.tolist()}"
+            columns = tuple(columns)
+        return _read_reference(path, mtime_ns, columns).copy()
+
+    return load
+
+
+@pytest.fixture(scope="session")
+def assert_same_data():
+    """Return function that asserts two (raw) dataframes hold the same data.
+
+    Compares the dtypes and per-row hashes, and only falls back to the much
+    slower element-wise comparison to report what differs.
+    """
+
+    def check(left: pd.DataFrame, right: pd.DataFrame):
+        same = (
+            left.dtypes.equals(right.dtypes)
+            and left.index.equals(right.index)
+            and np.array_equal(
+                pd.util.hash_pandas_object(left).to_numpy(),
+                pd.util.hash_pandas_object(right).to_numpy(),
+            )
+        )
+        if not same:
+            pd.testing.assert_frame_equal(left, right)
+
+    return check
+
+
 ### Add markers to skip download tests and for updating reference data
 # https://docs.pytest.org/en/latest/example/simple.html#control-skipping-of-tests-according-to-command-line-option
 
@@ -56,6 +136,9 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "update: mark test as function to update reference data"
     )
+    config.addinivalue_line(
+        "markers", "slow: mark test as slow, e.g. because it starts a new process"
+    )
 
 
 def pytest_collection_modifyitems(config, items):
@@ -91,7 +174,7 @@ def redownload(pytestconfig):
 ### Test areas
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def germany():
     return {
         "name": "Germany",
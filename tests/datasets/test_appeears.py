@@ -1,8 +1,9 @@
 from textwrap import dedent
+from types import MappingProxyType
 
-import geopandas as gpd
 import pandas as pd
 import pytest
+import yaml
 
 from springtime.config import CONFIG
 from springtime.datasets import Appeears, load_dataset
@@ -19,7 +20,7 @@ To include download, run:
     pytest tests/datasets/test_appeears.py --include-downloads
 """
 
-REFERENCE_DATA = CONFIG.cache_dir / "appeears_load_reference.geojson"
+REFERENCE_DATA = CONFIG.cache_dir / "appeears_load_reference.parquet"
 REFERENCE_RECIPE = dedent(
     """\
         dataset: appears
@@ -48,58 +49,54 @@ REFERENCE_RECIPE = dedent(
         infer_date_offset: true
         """
 )
+REFERENCE_RECIPE_DICT = yaml.safe_load(REFERENCE_RECIPE)
+REFERENCE_DATASET = load_dataset(REFERENCE_RECIPE)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def reference_args():
-    return dict(
-        years=[2009, 2011],
-        product="MCD12Q2",
-        version="061",
-        layers=["Greenup", "Dormancy"],
-        points=[(9.1, 49.1), (9.6, 49.6), (9.9, 49.9)],
-        area={"name": "eastfrankfurt", "bbox": [9.0, 49.0, 10.0, 50.0]},
+    return MappingProxyType(
+        dict(
+            years=[2009, 2011],
+            product="MCD12Q2",
+            version="061",
+            layers=["Greenup", "Dormancy"],
+            points=[(9.1, 49.1), (9.6, 49.6), (9.9, 49.9)],
+            area={"name": "eastfrankfurt", "bbox": [9.0, 49.0, 10.0, 50.0]},
+        )
     )
 
 
 def test_load_points(reference_args):
-    reference_args.update(area=None)
-    dataset = Appeears(**reference_args)
+    args = {**reference_args, "area": None}
+    dataset = Appeears(**args)
     dataset.load()
 
 
 def test_load_area(reference_args):
-    reference_args.update(points=None)
-    dataset = Appeears(**reference_args)
+    args = {**reference_args, "points": None}
+    dataset = Appeears(**args)
     dataset.load()
 
 
-def test_load_points_and_area(reference_args):
+def test_load_points_and_area(reference_args, load_reference):
     dataset = Appeears(**reference_args)
     loaded_data = dataset.load()
 
-    reference = gpd.read_file(REFERENCE_DATA)
-    assert set(loaded_data.columns) == set(
-        reference.columns
-    ), f"""
-        Columns differ. New columns are {loaded_data.columns},
-        vs reference {reference.columns}."""
-
+    reference = load_reference(REFERENCE_DATA, columns=loaded_data.columns)
     pd.testing.assert_frame_equal(
-        loaded_data, reference[loaded_data.columns.values], check_dtype=False
+        loaded_data, reference, check_like=True, check_dtype=False
     )
 
 
 def test_to_recipe(reference_args):
     dataset = Appeears(**reference_args)
-    recipe = dataset.to_recipe()
-    assert recipe == REFERENCE_RECIPE
+    assert dataset.to_recipe_dict() == REFERENCE_RECIPE_DICT
 
 
 def test_from_recipe(reference_args):
     original = Appeears(**reference_args)
-    reloaded = load_dataset(REFERENCE_RECIPE)
-    assert original == reloaded
+    assert original == REFERENCE_DATASET
 
 
 def test_export_reload(reference_args):
@@ -120,15 +117,15 @@ def test_update_reference_data(reference_args, redownload):
         fn.unlink()
 
     loaded_data = dataset.load()
-    loaded_data.to_file(REFERENCE_DATA)
+    loaded_data.to_parquet(REFERENCE_DATA)
 
 
 @pytest.mark.update
 def test_update_point_data(reference_args, redownload):
     """Update the point reference data."""
     if redownload:
-        reference_args.update(area=None)
-        dataset = Appeears(**reference_args)
+        args = {**reference_args, "area": None}
+        dataset = Appeears(**args)
         fn = dataset._root_dir / dataset._point_path(dataset.points)
         fn.unlink()
         dataset.download()
@@ -1,9 +1,10 @@
 import shutil
 from textwrap import dedent
+from types import MappingProxyType
 
-import geopandas as gpd
 import pandas as pd
 import pytest
+import yaml
 
 from springtime.config import CONFIG
 from springtime.datasets import Daymet, load_dataset
@@ -20,7 +21,7 @@ To include download, run:
     pytest tests/datasets/test_daymet.py --include-downloads
 """
 
-REFERENCE_DATA = CONFIG.cache_dir / "daymet_load_reference.geojson"
+REFERENCE_DATA = CONFIG.cache_dir / "daymet_load_reference.parquet"
 REFERENCE_RECIPE = dedent(
     """\
       dataset: daymet
@@ -48,14 +49,16 @@ REFERENCE_RECIPE = dedent(
       frequency: monthly
         """
 )
+REFERENCE_RECIPE_DICT = yaml.safe_load(REFERENCE_RECIPE)
+REFERENCE_DATASET = load_dataset(REFERENCE_RECIPE)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def indianapolis():
     return {"name": "indianapolis", "bbox": [-86.5, 39.5, -86, 40.1]}
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def points():
     return [
         [-84.2625, 36.0133],
@@ -64,55 +67,49 @@ def points():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def reference_args(points, indianapolis):
-    return dict(
-        variables=["tmin", "tmax"],
-        points=points,
-        area=indianapolis,
-        years=[2000, 2002],
-        frequency="monthly",
+    return MappingProxyType(
+        dict(
+            variables=["tmin", "tmax"],
+            points=points,
+            area=indianapolis,
+            years=[2000, 2002],
+            frequency="monthly",
+        )
     )
 
 
 def test_load_points(reference_args):
-    reference_args.update(area=None, frequency="daily")
-    dataset = Daymet(**reference_args)
+    args = {**reference_args, "area": None, "frequency": "daily"}
+    dataset = Daymet(**args)
     dataset.load()
 
 
 def test_load_area(reference_args):
-    reference_args.update(points=None)
-    dataset = Daymet(**reference_args)
+    args = {**reference_args, "points": None}
+    dataset = Daymet(**args)
     dataset.load()
 
 
-def test_load_points_and_area(reference_args):
+def test_load_points_and_area(reference_args, load_reference):
     dataset = Daymet(**reference_args)
     loaded_data = dataset.load()
 
-    reference = gpd.read_file(REFERENCE_DATA)
-    assert set(loaded_data.columns) == set(
-        reference.columns
-    ), f"""
-        Columns differ. New columns are {loaded_data.columns},
-        vs reference {reference.columns}."""
-
+    reference = load_reference(REFERENCE_DATA, columns=loaded_data.columns)
     pd.testing.assert_frame_equal(
-        loaded_data, reference[loaded_data.columns.values], check_dtype=False
+        loaded_data, reference, check_like=True, check_dtype=False
     )
 
 
 def test_to_recipe(reference_args):
     dataset = Daymet(**reference_args)
-    recipe = dataset.to_recipe()
-    assert recipe == REFERENCE_RECIPE
+    assert dataset.to_recipe_dict() == REFERENCE_RECIPE_DICT
 
 
 def test_from_recipe(reference_args):
     original = Daymet(**reference_args)
-    reloaded = load_dataset(REFERENCE_RECIPE)
-    assert original == reloaded
+    assert original == REFERENCE_DATASET
 
 
 def test_export_reload(reference_args):
@@ -132,14 +129,14 @@ def test_update_reference_data(reference_args, redownload):
         shutil.rmtree(dataset._box_dir)
 
     loaded_data = dataset.load()
-    loaded_data.to_file(REFERENCE_DATA)
+    loaded_data.to_parquet(REFERENCE_DATA)
 
 
 @pytest.mark.download
 def test_download_points(temporary_cache_dir, reference_args):
     """Check that the downloaded CSV file is properly parsed"""
-    reference_args.update(area=None, frequency="daily")
-    dataset = Daymet(**reference_args)
+    args = {**reference_args, "area": None, "frequency": "daily"}
+    dataset = Daymet(**args)
 
     with temporary_cache_dir():
         data = dataset.raw_load()
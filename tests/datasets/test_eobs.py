@@ -1,10 +1,12 @@
 import shutil
 from textwrap import dedent
+from types import MappingProxyType
 
 import geopandas as gpd
 import pandas as pd
 import pytest
 import xarray as xr
+import yaml
 
 from springtime.config import CONFIG
 from springtime.datasets import load_dataset
@@ -23,7 +25,7 @@ To include download, run:
     pytest tests/datasets/test_eobs.py --include-downloads
 """
 
-REFERENCE_DATA = CONFIG.cache_dir / "eobs_load_reference.geojson"
+REFERENCE_DATA = CONFIG.cache_dir / "eobs_load_reference.parquet"
 REFERENCE_RECIPE = dedent(
     """\
         dataset: E-OBS
@@ -52,27 +54,43 @@ REFERENCE_RECIPE = dedent(
         minimize_cache: true
         """
 )
+REFERENCE_RECIPE_DICT = yaml.safe_load(REFERENCE_RECIPE)
+REFERENCE_DATASET = load_dataset(REFERENCE_RECIPE)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def reference_args(germany):
-    return dict(
-        grid_resolution="0.25deg",
-        years=["2000", "2002"],
-        points=[(5, 10), (10, 12)],
-        variables=[
-            "mean_temperature",
-            "minimum_temperature",
-        ],
-        area=germany,
-        minimize_cache=True,
+    return MappingProxyType(
+        dict(
+            grid_resolution="0.25deg",
+            years=["2000", "2002"],
+            points=[(5, 10), (10, 12)],
+            variables=[
+                "mean_temperature",
+                "minimum_temperature",
+            ],
+            area=germany,
+            minimize_cache=True,
+        )
     )
 
 
+@pytest.fixture(scope="module")
+def dataset(reference_args):
+    return EOBS(**reference_args)
+
+
+@pytest.fixture(scope="module")
+def loaded_data(dataset):
+    return dataset.load()
+
+
 def test_load_full_grid(reference_args):
     args = {**reference_args, "points": None}
     ds = EOBS(**args).load()
     assert isinstance(ds, xr.Dataset)
+    # Gridded data is returned lazily; nothing should be read into memory
+    assert all(var.chunks is not None for var in ds.data_vars.values())
 
 
 def test_load_single_point(reference_args):
@@ -87,29 +105,23 @@ def test_load_multiple_points(reference_args):
     assert isinstance(df, pd.DataFrame)
 
 
-def test_to_recipe(reference_args):
-    dataset = EOBS(**reference_args)
-    recipe = dataset.to_recipe()
-    assert recipe == REFERENCE_RECIPE
+def test_to_recipe(dataset):
+    assert dataset.to_recipe_dict() == REFERENCE_RECIPE_DICT
 
 
-def test_from_recipe(reference_args):
-    original = EOBS(**reference_args)
-    reloaded = load_dataset(REFERENCE_RECIPE)
-    assert original == reloaded
+def test_from_recipe(dataset):
+    assert dataset == REFERENCE_DATASET
 
 
-def test_export_reload(reference_args):
-    original = EOBS(**reference_args)
-    recipe = original.to_recipe()
+def test_export_reload(dataset):
+    recipe = dataset.to_recipe()
     reloaded = load_dataset(recipe)
-    assert original == reloaded
+    assert dataset == reloaded
 
 
 @pytest.mark.download
-def test_download(temporary_cache_dir, reference_args):
+def test_download(dataset, temporary_cache_dir):
     """Check download hasn't changed; also uses raw_load"""
-    dataset = EOBS(**reference_args)
 
     # The reference data is shipped with the test suite, loaded from TEST_CACHE
     reference = dataset.raw_load()
@@ -120,24 +132,16 @@ def test_download(temporary_cache_dir, reference_args):
     pd.testing.assert_frame_equal(new_data, reference)
 
 
-def test_load(reference_args):
+def test_load(loaded_data, load_reference):
     """Compare loaded (i.e. processed) data with stored reference."""
-    dataset = EOBS(**reference_args)
-    loaded_data = dataset.load()
-    reference = gpd.read_file(REFERENCE_DATA)
-    assert set(loaded_data.columns) == set(
-        reference.columns
-    ), f"""
-        Columns differ. New columns are {loaded_data.columns},
-        vs reference {reference.columns}."""
-
+    reference = load_reference(REFERENCE_DATA, columns=loaded_data.columns)
     pd.testing.assert_frame_equal(
-        loaded_data, reference[loaded_data.columns.values], check_dtype=False
+        loaded_data, reference, check_like=True, check_dtype=False
     )
 
 
-def test_extract_points(reference_args):
-    ds = EOBS(**reference_args).raw_load()
+def test_extract_points(dataset):
+    ds = dataset.raw_load()
     points = gpd.GeoSeries(
         gpd.points_from_xy(x=[0, 5, 7], y=[5, 10, 12]), name="geometry"
     )
@@ -150,10 +154,11 @@ def test_extract_points(reference_args):
 
 
 @pytest.mark.update
-def test_update_reference_data(reference_args, redownload):
+def test_update_reference_data(dataset, redownload):
     """Update the reference data for these tests."""
-    dataset = EOBS(**reference_args)
     if redownload:
         shutil.rmtree(dataset._root_dir)
     loaded_data = dataset.load()
-    loaded_data.to_file(REFERENCE_DATA)
+    loaded_data.to_parquet(
+        REFERENCE_DATA, geometry_encoding="geoarrow", compression="zstd"
+    )
@@ -1,8 +1,8 @@
 from textwrap import dedent
 
-import geopandas as gpd
 import pandas as pd
 import pytest
+import yaml
 
 from springtime.config import CONFIG
 from springtime.datasets import PEP725Phenor, load_dataset
@@ -19,7 +19,7 @@ To include download, run:
     pytest tests/datasets/test_pep725.py --include-downloads
 """
 
-REFERENCE_DATA = CONFIG.cache_dir / "pep725_load_reference.geojson"
+REFERENCE_DATA = CONFIG.cache_dir / "pep725_load_reference.parquet"
 REFERENCE_RECIPE = dedent(
     """\
         dataset: PEP725Phenor
@@ -33,6 +33,18 @@ REFERENCE_RECIPE = dedent(
         - day
         """
 )
+REFERENCE_RECIPE_DICT = yaml.safe_load(REFERENCE_RECIPE)
+REFERENCE_DATASET = load_dataset(REFERENCE_RECIPE)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002])
+
+
+@pytest.fixture(scope="module")
+def loaded_data(dataset):
+    return dataset.load()
 
 
 def test_instantiate_class():
@@ -43,29 +55,23 @@ def test_instantiate_with_area(germany):
     PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002], area=germany)
 
 
-def test_to_recipe():
-    dataset = PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002])
-    recipe = dataset.to_recipe()
-    assert recipe == REFERENCE_RECIPE
+def test_to_recipe(dataset):
+    assert dataset.to_recipe_dict() == REFERENCE_RECIPE_DICT
 
 
-def test_from_recipe():
-    original = PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002])
-    reloaded = load_dataset(REFERENCE_RECIPE)
-    assert original == reloaded
+def test_from_recipe(dataset):
+    assert dataset == REFERENCE_DATASET
 
 
-def test_export_reload():
-    original = PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002])
-    recipe = original.to_recipe()
+def test_export_reload(dataset):
+    recipe = dataset.to_recipe()
     reloaded = load_dataset(recipe)
-    assert original == reloaded
+    assert dataset == reloaded
 
 
 @pytest.mark.download
-def test_download(temporary_cache_dir):
+def test_download(dataset, temporary_cache_dir, assert_same_data):
     """Check download hasn't changed; also uses raw_load"""
-    dataset = PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002])
 
     # The reference data is shipped with the test suite, loaded from TEST_CACHE
     reference = dataset.raw_load()
@@ -74,28 +80,21 @@ def test_download(temporary_cache_dir):
         dataset.download()
         new_data = dataset.raw_load()
 
-    pd.testing.assert_frame_equal(new_data, reference)
+    assert_same_data(new_data, reference)
 
 
-def test_load():
+def test_load(loaded_data, load_reference):
     """Compare loaded (i.e. processed) data with stored reference."""
-    dataset = PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002])
-    loaded_data = dataset.load()
-    reference = gpd.read_file(REFERENCE_DATA)
-    assert set(loaded_data.columns) == set(
-        reference.columns
-    ), f"""
-        Columns differ. New columns are {loaded_data.columns},
-        vs reference {reference.columns}."""
-
-    pd.testing.assert_frame_equal(loaded_data, reference[loaded_data.columns.values])
+    reference = load_reference(REFERENCE_DATA, columns=loaded_data.columns)
+    pd.testing.assert_frame_equal(loaded_data, reference, check_like=True)
 
 
 @pytest.mark.update
-def test_update_reference_data(redownload):
+def test_update_reference_data(dataset, redownload):
     """Update the reference data for these tests."""
-    dataset = PEP725Phenor(species="Syringa vulgaris", years=[2000, 2002])
     if redownload:
         dataset._location.unlink()
     loaded_data = dataset.load()
-    loaded_data.to_file(REFERENCE_DATA)
+    loaded_data.to_parquet(
+        REFERENCE_DATA, geometry_encoding="geoarrow", compression="zstd"
+    )
@@ -1,9 +1,10 @@
 import shutil
 from textwrap import dedent
+from types import MappingProxyType
 
-import geopandas as gpd
 import pandas as pd
 import pytest
+import yaml
 
 from springtime.config import CONFIG
 from springtime.datasets import Phenocam, load_dataset
@@ -20,7 +21,7 @@ To include download, run:
     pytest tests/datasets/test_Phenocam.py --include-downloads
 """
 
-REFERENCE_DATA = CONFIG.cache_dir / "phenocam_load_reference.geojson"
+REFERENCE_DATA = CONFIG.cache_dir / "phenocam_load_reference.parquet"
 REFERENCE_RECIPE = dedent(
     """\
         dataset: phenocam
@@ -32,6 +33,8 @@ REFERENCE_RECIPE = dedent(
         site: harvard$
         """
 )
+REFERENCE_RECIPE_DICT = yaml.safe_load(REFERENCE_RECIPE)
+REFERENCE_DATASET = load_dataset(REFERENCE_RECIPE)
 
 
 @pytest.fixture
@@ -39,61 +42,53 @@ def harvard_bbox():
     return {"name": "harvard", "bbox": [-73, 42, -72, 43]}
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def reference_args():
-    return dict(site="harvard$", years=(2010, 2015))
+    return MappingProxyType(dict(site="harvard$", years=(2010, 2015)))
 
 
-def test_load_exact_match(reference_args):
+def test_load_exact_match(reference_args, load_reference):
     dataset = Phenocam(**reference_args)
     loaded_data = dataset.load()
 
-    reference = gpd.read_file(REFERENCE_DATA)
-    assert set(loaded_data.columns) == set(
-        reference.columns
-    ), f"""
-        Columns differ. New columns are {loaded_data.columns},
-        vs reference {reference.columns}."""
-
+    reference = load_reference(REFERENCE_DATA, columns=loaded_data.columns)
     pd.testing.assert_frame_equal(
-        loaded_data, reference[loaded_data.columns.values], check_dtype=False
+        loaded_data, reference, check_like=True, check_dtype=False
     )
 
 
 def test_instantiate_approximate_match(reference_args):
-    reference_args.update(site="harvard")
-    Phenocam(**reference_args)
+    args = {**reference_args, "site": "harvard"}
+    Phenocam(**args)
 
 
 @pytest.mark.download
 def test_load_approx(reference_args):
-    reference_args.update(site="harvard")
-    dataset = Phenocam(**reference_args)
+    args = {**reference_args, "site": "harvard"}
+    dataset = Phenocam(**args)
     dataset.load()
 
 
 @pytest.mark.download
 def test_load_area(reference_args, harvard_bbox):
-    reference_args.update(site=None, area=harvard_bbox)
-    dataset = Phenocam(**reference_args)
+    args = {**reference_args, "site": None, "area": harvard_bbox}
+    dataset = Phenocam(**args)
     dataset.load()
 
 
 def test_instantiate_area(reference_args, harvard_bbox):
-    reference_args.update(site=None, area=harvard_bbox)
-    Phenocam(**reference_args)
+    args = {**reference_args, "site": None, "area": harvard_bbox}
+    Phenocam(**args)
 
 
 def test_to_recipe(reference_args):
     dataset = Phenocam(**reference_args)
-    recipe = dataset.to_recipe()
-    assert recipe == REFERENCE_RECIPE
+    assert dataset.to_recipe_dict() == REFERENCE_RECIPE_DICT
 
 
 def test_from_recipe(reference_args):
     original = Phenocam(**reference_args)
-    reloaded = load_dataset(REFERENCE_RECIPE)
-    assert original == reloaded
+    assert original == REFERENCE_DATASET
 
 
 def test_export_reload(reference_args):
@@ -105,7 +100,7 @@ def test_export_reload(reference_args):
 
 
 @pytest.mark.download
-def test_download(temporary_cache_dir, reference_args):
+def test_download(temporary_cache_dir, reference_args, assert_same_data):
     """Check download hasn't changed; also uses raw_load"""
     dataset = Phenocam(**reference_args)
 
@@ -115,7 +110,7 @@ def test_download(temporary_cache_dir, reference_args):
     with temporary_cache_dir():
         new_data = dataset.load()
 
-    pd.testing.assert_frame_equal(new_data, reference)
+    assert_same_data(new_data, reference)
 
 
 @pytest.mark.update
@@ -127,4 +122,6 @@ def test_update_reference_data(reference_args, redownload):
         shutil.rmtree(dataset._root_dir)
 
     loaded_data = dataset.load()
-    loaded_data.to_file(REFERENCE_DATA)
+    loaded_data.to_parquet(
+        REFERENCE_DATA, geometry_encoding="geoarrow", compression="zstd"
+    )
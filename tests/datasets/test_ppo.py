@@ -1,8 +1,9 @@
 from textwrap import dedent
+from types import MappingProxyType
 
-import geopandas as gpd
 import pandas as pd
 import pytest
+import yaml
 
 from springtime.config import CONFIG
 from springtime.datasets import RPPO, load_dataset
@@ -19,7 +20,7 @@ To include download, run:
     pytest tests/test_ppo.py --include-downloads
 """
 
-REFERENCE_DATA = CONFIG.cache_dir / "ppo_load_reference.geojson"
+REFERENCE_DATA = CONFIG.cache_dir / "ppo_load_reference.parquet"
 REFERENCE_RECIPE = dedent(
     """\
       dataset: rppo
@@ -35,47 +36,55 @@ REFERENCE_RECIPE = dedent(
       infer_event: first_yes_day
         """
 )
+REFERENCE_RECIPE_DICT = yaml.safe_load(REFERENCE_RECIPE)
+REFERENCE_DATASET = load_dataset(REFERENCE_RECIPE)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def reference_args():
-    return dict(
-        years=[1990, 2020],
-        genus="Syringa",
-        termID="obo:PPO_0002032",  # flowers present
-        exclude_terms=["obo:PPO_0002335"],  # senesced flowers present
-        infer_event="first_yes_day",
-        limit=10000,
+    return MappingProxyType(
+        dict(
+            years=[1990, 2020],
+            genus="Syringa",
+            termID="obo:PPO_0002032",  # flowers present
+            exclude_terms=["obo:PPO_0002335"],  # senesced flowers present
+            infer_event="first_yes_day",
+            limit=10000,
+        )
     )
 
 
-def test_load_reference(reference_args):
-    RPPO(**reference_args).load()
+@pytest.fixture(scope="module")
+def dataset(reference_args):
+    return RPPO(**reference_args)
 
 
-def test_to_recipe(reference_args):
-    dataset = RPPO(**reference_args)
-    recipe = dataset.to_recipe()
-    assert recipe == REFERENCE_RECIPE
+@pytest.fixture(scope="module")
+def loaded_data(dataset):
+    return dataset.load()
+
+
+def test_load_reference(loaded_data):
+    assert not loaded_data.empty
+
+
+def test_to_recipe(dataset):
+    assert dataset.to_recipe_dict() == REFERENCE_RECIPE_DICT
 
 
-def test_from_recipe(reference_args):
-    original = RPPO(**reference_args)
-    reloaded = load_dataset(REFERENCE_RECIPE)
-    assert original == reloaded
+def test_from_recipe(dataset):
+    assert dataset == REFERENCE_DATASET
 
 
-def test_export_reload(reference_args):
-    original = RPPO(**reference_args)
-    recipe = original.to_recipe()
+def test_export_reload(dataset):
+    recipe = dataset.to_recipe()
     reloaded = load_dataset(recipe)
-    assert original == reloaded
+    assert dataset == reloaded
 
 
 @pytest.mark.download
-def test_download(temporary_cache_dir, reference_args):
+def test_download(dataset, temporary_cache_dir, assert_same_data):
     """Check download hasn't changed; also uses raw_load"""
-    dataset = RPPO(**reference_args)
 
     # The reference data is shipped with the test suite, loaded from TEST_CACHE
     reference = dataset.raw_load()
@@ -84,7 +93,7 @@ def test_download(temporary_cache_dir, reference_args):
         dataset.download()
         new_data = dataset.raw_load()
 
-    pd.testing.assert_frame_equal(new_data, reference)
+    assert_same_data(new_data, reference)
 
 
 @pytest.mark.download
@@ -93,25 +102,18 @@ def test_load_with_area(temporary_cache_dir, germany, reference_args):
         RPPO(**reference_args, area=germany).load()
 
 
-def test_load(reference_args):
+def test_load(loaded_data, load_reference):
     """Compare loaded (i.e. processed) data with stored reference."""
-    dataset = RPPO(**reference_args)
-    loaded_data = dataset.load()
-    reference = gpd.read_file(REFERENCE_DATA)
-    assert set(loaded_data.columns) == set(
-        reference.columns
-    ), f"""
-        Columns differ. New columns are {loaded_data.columns},
-        vs reference {reference.columns}."""
-
-    pd.testing.assert_frame_equal(loaded_data, reference[loaded_data.columns.values])
+    reference = load_reference(REFERENCE_DATA, columns=loaded_data.columns)
+    pd.testing.assert_frame_equal(loaded_data, reference, check_like=True)
 
 
 @pytest.mark.update
-def test_update_reference_data(redownload, reference_args):
+def test_update_reference_data(dataset, redownload):
     """Update the reference data for these tests."""
-    dataset = RPPO(**reference_args)
     if redownload and dataset._path().exists():
         dataset._path().unlink()
     loaded_data = dataset.load()
-    loaded_data.to_file(REFERENCE_DATA)
+    loaded_data.to_parquet(
+        REFERENCE_DATA, geometry_encoding="geoarrow", compression="zstd"
+    )
@@ -1,9 +1,9 @@
 import shutil
 from textwrap import dedent
 
-import geopandas as gpd
 import pandas as pd
 import pytest
+import yaml
 
 from springtime.config import CONFIG
 from springtime.datasets import RNPN, load_dataset
@@ -20,7 +20,7 @@ To include download, run:
     pytest tests/datasets/test_rnpn.py --include-downloads
 """
 
-REFERENCE_DATA = CONFIG.cache_dir / "rnpn_load_reference.geojson"
+REFERENCE_DATA = CONFIG.cache_dir / "rnpn_load_reference.parquet"
 REFERENCE_RECIPE = dedent(
     """\
         dataset: RNPN
@@ -39,9 +39,11 @@ REFERENCE_RECIPE = dedent(
         aggregation_operator: median
         """
 )
+REFERENCE_RECIPE_DICT = yaml.safe_load(REFERENCE_RECIPE)
+REFERENCE_DATASET = load_dataset(REFERENCE_RECIPE)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def dataset():
     return RNPN(
         species_ids={"name": "Syringa", "items": [36]},
@@ -50,27 +52,23 @@ def dataset():
     )
 
 
-def test_load(dataset):
-    """Compare loaded (i.e. processed) data with stored reference."""
-    loaded_data = dataset.load()
-    reference = gpd.read_file(REFERENCE_DATA)
-    assert set(loaded_data.columns) == set(
-        reference.columns
-    ), f"""
-        Columns differ. New columns are {loaded_data.columns},
-        vs reference {reference.columns}."""
+@pytest.fixture(scope="module")
+def loaded_data(dataset):
+    return dataset.load()
 
-    pd.testing.assert_frame_equal(loaded_data, reference[loaded_data.columns.values])
+
+def test_load(loaded_data, load_reference):
+    """Compare loaded (i.e. processed) data with stored reference."""
+    reference = load_reference(REFERENCE_DATA, columns=loaded_data.columns)
+    pd.testing.assert_frame_equal(loaded_data, reference, check_like=True)
 
 
 def test_to_recipe(dataset):
-    recipe = dataset.to_recipe()
-    assert recipe == REFERENCE_RECIPE
+    assert dataset.to_recipe_dict() == REFERENCE_RECIPE_DICT
 
 
 def test_from_recipe(dataset):
-    reloaded = load_dataset(REFERENCE_RECIPE)
-    assert dataset == reloaded
+    assert dataset == REFERENCE_DATASET
 
 
 def test_export_reload(dataset):
@@ -80,7 +78,7 @@ def test_export_reload(dataset):
 
 
 @pytest.mark.download
-def test_download(dataset, temporary_cache_dir):
+def test_download(dataset, temporary_cache_dir, assert_same_data):
     """Check download hasn't changed; also uses raw_load"""
 
     # The reference data is shipped with the test suite, loaded from TEST_CACHE
@@ -90,7 +88,7 @@ def test_download(dataset, temporary_cache_dir):
         dataset.download()
         new_data = dataset.raw_load()
 
-    pd.testing.assert_frame_equal(new_data, reference)
+    assert_same_data(new_data, reference)
 
 
 @pytest.mark.update
@@ -102,4 +100,6 @@ def test_update_reference_data(dataset, redownload):
         shutil.rmtree(cache_dir)
 
     loaded_data = dataset.load()
-    loaded_data.to_file(REFERENCE_DATA)
+    loaded_data.to_parquet(
+        REFERENCE_DATA, geometry_encoding="geoarrow", compression="zstd"
+    )
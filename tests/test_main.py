@@ -1,5 +1,7 @@
+import os
 import subprocess
 
+import pytest
 from click.testing import CliRunner
 
 from springtime.main import cli
@@ -7,9 +9,18 @@ from springtime.main import cli
 
 def test_cli():
     runner = CliRunner()
-    runner.invoke(cli, ["--help"])
-    subprocess.run("springtime --help", shell=True)
+    result = runner.invoke(cli, ["--help"])
+    assert result.exit_code == 0
 
     # TODO after dropping pyphenology (#116) we need new sample data
     # runner.invoke(cli, ["--recipe", "tests/recipes/pyphenology.yaml"])
-    # subprocess.run("springtime tests/recipes/pyphenology.yaml", shell=True)
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    bool(os.getenv("SPRINGTIME_SKIP_SUBPROCESS")),
+    reason="SPRINGTIME_SKIP_SUBPROCESS is set",
+)
+def test_cli_entry_point():
+    """Check the installed springtime command works."""
+    subprocess.run(["springtime", "--help"], check=True, capture_output=True)
@@ -1,19 +1,27 @@
+import shutil
 import subprocess
 import time
 
 import pytest
 
-from springtime.utils import TimeoutError, retry
+from springtime.utils import (
+    _R_IDLE_WORKERS,
+    _R_MAX_IDLE_WORKERS,
+    TimeoutError,
+    retry,
+    run_r_script,
+    run_r_scripts,
+)
 
 
-@retry(timeout=3, max_tries=3)
+@retry(timeout=0.1, max_tries=2, delay=0)
 def long_function():
-    time.sleep(5)
+    time.sleep(0.5)
 
 
-@retry(timeout=3, max_tries=3)
+@retry(timeout=0.1, max_tries=2, delay=0)
 def long_r_subprocess():
-    subprocess.run(["R", "--no-save"], input="Sys.sleep(5)".encode())
+    subprocess.run(["R", "--no-save"], input="Sys.sleep(0.5)".encode())
 
 
 def test_long_function():
@@ -21,6 +29,36 @@ def test_long_function():
         long_function()
 
 
+@pytest.mark.slow
+@pytest.mark.skipif(shutil.which("R") is None, reason="R is not installed")
 def test_r_subprocess():
     with pytest.raises(TimeoutError):
         long_r_subprocess()
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(shutil.which("R") is None, reason="R is not installed")
+def test_r_script_quits():
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        run_r_script('message("bye"); quit(status=3)', max_tries=1)
+    assert excinfo.value.returncode == 3
+    assert "bye" in excinfo.value.stderr
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(shutil.which("R") is None, reason="R is not installed")
+def test_run_r_scripts(tmp_path):
+    paths = [tmp_path / f"{i}.txt" for i in range(4)]
+    scripts = [f'writeLines("done", "{path.as_posix()}")' for path in paths]
+
+    run_r_scripts(scripts, timeout=10, max_tries=1, max_workers=4)
+
+    assert all(path.read_text().strip() == "done" for path in paths)
+    assert len(_R_IDLE_WORKERS) <= _R_MAX_IDLE_WORKERS
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(shutil.which("R") is None, reason="R is not installed")
+def test_run_r_scripts_failure():
+    with pytest.raises(subprocess.CalledProcessError):
+        run_r_scripts(['stop("failed")', "1 + 1"], timeout=10, max_tries=1)
@@ -5,32 +5,39 @@ import pytest
 import xarray as xr
 from geopandas.testing import assert_geodataframe_equal
 from numpy.testing import assert_array_equal
+from pydantic import ValidationError
 from shapely.geometry import Point
 
-from springtime.utils import points_from_cube, resample, rolling_mean, transponse_df
+import springtime.utils
+from springtime.utils import (
+    NamedArea,
+    YearRange,
+    join_dataframes,
+    points_from_cube,
+    resample,
+    rolling_mean,
+    split_time,
+    transponse_df,
+)
 
 
-def test_join_spatiotemporal_same_geometry():
-    input = gpd.GeoDataFrame(
+@pytest.fixture(scope="module")
+def sample_input_df():
+    """Two points with two days of measurements in each of two years."""
+    return pd.DataFrame(
         {
             "year": [2000, 2000, 2000, 2000, 2001, 2001, 2001, 2001],
             "geometry": gpd.GeoSeries(
-                [
-                    Point(1, 1),
-                    Point(1, 1),
-                    Point(2, 2),
-                    Point(2, 2),
-                    Point(1, 1),
-                    Point(1, 1),
-                    Point(2, 2),
-                    Point(2, 2),
-                ]
+                gpd.points_from_xy([1, 1, 2, 2, 1, 1, 2, 2], [1, 1, 2, 2, 1, 1, 2, 2])
             ),
             "doy": [1, 2, 1, 2, 1, 2, 1, 2],
             "measurementx": [1, 2, 3, 4, 5, 6, 7, 8],
         }
     )
-    predictor = transponse_df(input)
+
+
+def test_join_spatiotemporal_same_geometry(sample_input_df):
+    predictor = transponse_df(sample_input_df)
     target = gpd.GeoDataFrame(
         {
             "year": [1999, 2000, 2000, 2001, 2001, 2002],
@@ -38,14 +45,7 @@ def test_join_spatiotemporal_same_geometry():
                 # [Point(1.01, 1.01), Point(1.01, 1.01), Point(2.1, 2.1),
                 # Point(1.01, 1.01), Point(2.1, 2.1), Point(2.1, 2.1)] Only do
                 # geometry exact match
-                [
-                    Point(1.0, 1.0),
-                    Point(1.0, 1.0),
-                    Point(2, 2),
-                    Point(1.0, 1.0),
-                    Point(2, 2),
-                    Point(2, 2),
-                ]
+                gpd.points_from_xy([1, 1, 2, 1, 2, 2], [1, 1, 2, 1, 2, 2])
                 # [Point(1.01, 1.01), Point(1.01, 1.01), Point(2, 2),
                 # Point(1.01, 1.01), Point(2, 2), Point(2, 2)]
             ),
@@ -87,28 +87,58 @@ def test_join_spatiotemporal_same_geometry():
     assert_geodataframe_equal(result, expected)
 
 
-def test_transpose_geometry_doy_as_column():
-    input = pd.DataFrame(
+def test_join_dataframes():
+    first = gpd.GeoDataFrame(
+        {"year": [2001, 2000, 2000, 2000], "x": [1, 2, 3, 4]},
+        geometry=[Point(5, 5), Point(5, 5), Point(1, 1), Point(1, 1, 1)],
+    )
+    second = gpd.GeoDataFrame(
+        {"year": [2000, 2000, 2002, 2000], "y": [10, 20, 30, 40]},
+        # Point(1.0000001, 1) is equal to Point(1, 1) after rounding
+        geometry=[Point(1.0000001, 1), Point(5, 5), Point(3, 3), Point(1, 1, 2)],
+    )
+
+    result = join_dataframes([first, second])
+
+    expected = gpd.GeoDataFrame(
         {
-            "year": [2000, 2000, 2000, 2000, 2001, 2001, 2001, 2001],
-            "geometry": gpd.GeoSeries(
-                [
-                    Point(1, 1),
-                    Point(1, 1),
-                    Point(2, 2),
-                    Point(2, 2),
-                    Point(1, 1),
-                    Point(1, 1),
-                    Point(2, 2),
-                    Point(2, 2),
-                ]
-            ),
-            "doy": [1, 2, 1, 2, 1, 2, 1, 2],
-            "measurementx": [1, 2, 3, 4, 5, 6, 7, 8],
-        }
+            "year": [2000, 2000, 2000, 2000, 2001, 2002],
+            "x": [2, 3, 4, np.nan, 1, np.nan],
+            "y": [20, 10, np.nan, 40, np.nan, 30],
+        },
+        geometry=[
+            Point(5, 5),
+            Point(1, 1),
+            Point(1, 1, 1),
+            Point(1, 1, 2),
+            Point(5, 5),
+            Point(3, 3),
+        ],
+    ).set_index(["year", "geometry"])
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_join_dataframes_missing_geometry():
+    first = gpd.GeoDataFrame(
+        {"year": [2000, 2000, 2000], "x": [1, 2, 3]},
+        geometry=[None, Point(1, 1), Point(2, 2)],
+    )
+    second = gpd.GeoDataFrame(
+        {"year": [2000, 2000], "y": [10, 20]},
+        geometry=[Point(1, 1), Point(2, 2)],
     )
 
-    result = transponse_df(input)
+    result = join_dataframes([first, second])
+
+    expected = gpd.GeoDataFrame(
+        {"year": [2000, 2000, 2000], "x": [1, 2, 3], "y": [np.nan, 10, 20]},
+        geometry=[None, Point(1, 1), Point(2, 2)],
+    ).set_index(["year", "geometry"])
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_transpose_geometry_doy_as_column(sample_input_df):
+    result = transponse_df(sample_input_df)
 
     expected = gpd.GeoDataFrame(
         {
@@ -130,36 +160,66 @@ def test_transpose_geometry_doy_as_column():
             ],
         }
     )
-    print(input)
+    print(sample_input_df)
     print(result)
     print(expected)
     pd.testing.assert_frame_equal(result, expected)
 
 
-@pytest.mark.skip(reason="not yet implemented")  # noqa: F821
-def test_rolling_average():
+@pytest.mark.parametrize("complete", [True, False])
+def test_transpose_doy_matches_pivot(complete, monkeypatch):
     input = pd.DataFrame(
         {
-            "year": [2000, 2000, 2000, 2000, 2001, 2001, 2001, 2001],
+            "year": [2001, 2001, 2000, 2000, 2000, 2000, 2000, 2000],
             "geometry": gpd.GeoSeries(
-                [
-                    Point(1, 1),
-                    Point(1, 1),
-                    Point(2, 2),
-                    Point(2, 2),
-                    Point(1, 1),
-                    Point(1, 1),
-                    Point(2, 2),
-                    Point(2, 2),
-                ]
+                gpd.points_from_xy([2, 2, 2, 2, 1, 1, -3, -3], [2, 2, 2, 2, 1, 1, 5, 5])
             ),
-            "doy": [1, 2, 1, 2, 1, 2, 1, 2],
-            "measurementx": [1, 2, 3, 4, 5, 6, 7, 8],
+            "doy": [1, 2, 2, 1, 1, 2, 1, 2],
+            "float32": np.arange(8, dtype=np.float32),
+            "int": np.arange(8),
         }
     )
+    if not complete:
+        input = input.drop(index=5)
 
+    result = transponse_df(input)
+
+    # Force the generic pivot
+    monkeypatch.setattr(springtime.utils, "_is_plain_numeric", lambda series: False)
+    expected = transponse_df(input)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_transpose_month_as_column():
+    input = pd.DataFrame(
+        {
+            "year": [2000, 2000, 2001, 2001],
+            "geometry": gpd.GeoSeries(gpd.points_from_xy([1, 1, 1, 1], [1, 1, 1, 1])),
+            "month": [1, 2, 1, 2],
+            "measurementx": [1, 2, 3, 4],
+        }
+    )
+
+    result = transponse_df(input, columns=("month",))
+
+    expected = gpd.GeoDataFrame(
+        {
+            "year": [2000, 2001],
+            "geometry": gpd.GeoSeries([Point(1, 1), Point(1, 1)]),
+            "measurementx_1": [1, 3],
+            "measurementx_2": [2, 4],
+        }
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_rolling_average(sample_input_df):
     result = rolling_mean(
-        input, over=["measurementx"], groupby=["year", "geometry"], window_sizes=[2]
+        sample_input_df,
+        over=["measurementx"],
+        groupby=["year", "geometry"],
+        window_sizes=[2],
     )
 
     expected = pd.DataFrame(
@@ -181,9 +241,31 @@ def test_rolling_average():
     pd.testing.assert_frame_equal(result, expected)
 
 
+def test_rolling_average_missing_year(sample_input_df):
+    input = sample_input_df.assign(
+        year=[2000, 2000, 2000, 2000, np.nan, np.nan, 2001, 2001]
+    )
+
+    result = rolling_mean(
+        input,
+        over=["measurementx"],
+        groupby=["year", "geometry"],
+        window_sizes=[2],
+    )
+
+    expected = pd.DataFrame(
+        {
+            "year": [2000.0, 2000.0, 2001.0],
+            "geometry": gpd.GeoSeries([Point(1, 1), Point(2, 2), Point(2, 2)]),
+            "measurementx_2_0": [1.5, 3.5, 7.5],
+        }
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+
 @pytest.fixture
 def sample_df():
-    index = pd.date_range("20100101", "20111231", freq="h")
+    index = pd.date_range("20100101", "20111231", freq="D")
     data = np.random.randn(len(index))
     geometry = gpd.points_from_xy(np.ones(len(index)), np.ones(len(index)))
     df = gpd.GeoDataFrame({"values": data, "datetime": index}, geometry=geometry)
@@ -198,6 +280,40 @@ def test_resample_monthly(sample_df):
     assert_array_equal(resampled.year.unique(), np.array([2010, 2011]))
 
 
+@pytest.fixture(scope="module")
+def mixed_df():
+    """Two points with daily float (with gaps), integer and boolean values."""
+    index = pd.date_range("20100101", "20101231", freq="D")
+    n = len(index)
+    return gpd.GeoDataFrame(
+        {
+            "floats": np.where(np.arange(n) % 7 == 0, np.nan, np.arange(n) / 2),
+            "ints": np.arange(n),
+            "flags": np.arange(n) % 3 == 0,
+            "datetime": index,
+        },
+        geometry=gpd.points_from_xy(np.arange(n) % 2, np.ones(n)),
+    )
+
+
+@pytest.mark.parametrize("operator", ["mean", "sum", "min", "max"])
+def test_resample_flox_matches_pandas(mixed_df, operator, monkeypatch):
+    pytest.importorskip("flox")
+    with_flox = resample(mixed_df, operator=operator)
+
+    monkeypatch.setattr(springtime.utils, "flox", None)
+    with_pandas = resample(mixed_df, operator=operator)
+
+    pd.testing.assert_frame_equal(with_flox, with_pandas)
+
+
+def test_resample_empty(mixed_df):
+    resampled = resample(mixed_df.iloc[:0])
+
+    assert resampled.empty
+    assert {"geometry", "year", "month", "floats", "flags"} <= set(resampled.columns)
+
+
 def test_points_from_cube():
     # create a test dataset
     lons = np.arange(-180, 180, 20)
@@ -239,3 +355,79 @@ def test_points_from_cube():
         }
     )
     pd.testing.assert_frame_equal(result, expected)
+
+
+def test_year_range():
+    years = YearRange(2000, 2002).range
+
+    assert_array_equal(years, [2000, 2001, 2002])
+    assert years.dtype == np.int16
+    assert not years.flags.writeable
+    assert years is YearRange(2000, 2002).range
+
+
+def test_named_area_follows_bbox_changes():
+    points = gpd.GeoSeries(gpd.points_from_xy([5, 15], [50, 50]))
+    area = NamedArea(name="west", bbox=[0, 45, 10, 55])
+    assert_array_equal(area.contains_mask(points), [True, False])
+
+    moved = area.model_copy(update={"bbox": (10, 45, 20, 55)})
+    assert_array_equal(moved.contains_mask(points), [False, True])
+    assert_array_equal(area.contains_mask(points), [True, False])
+
+    area.bbox = (0, 45, 20, 55)
+    assert_array_equal(area.contains_mask(points), [True, True])
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+@pytest.mark.parametrize(
+    "freq, time",
+    [
+        # A calendar without leap days gives a complete year x day grid
+        (
+            "daily",
+            xr.date_range(
+                "2000-01-01", "2002-12-31", calendar="noleap", use_cftime=True
+            ),
+        ),
+        ("monthly", pd.date_range("2000-01-01", periods=36, freq="MS")),
+    ],
+)
+def test_split_time_matches_unstack(freq, time, chunked):
+    shape = (len(time), 2)
+    ds = xr.Dataset(
+        data_vars={
+            "var1": (["time", "lat"], np.arange(np.prod(shape)).reshape(shape)),
+            "var2": (["lat"], [0.5, 1.5]),
+        },
+        coords={"time": time, "lat": [50, 51], "step": ("time", np.arange(len(time)))},
+    )
+    if chunked:
+        ds = ds.chunk(time=10)
+
+    result = split_time(ds, freq)
+
+    # The generic path of split_time
+    index = ds.indexes["time"]
+    timeinyear = index.dayofyear if freq == "daily" else index.month
+    expected = (
+        ds.assign_coords(year=("time", index.year), timeinyear=("time", timeinyear))
+        .set_index(time=("year", "timeinyear"))
+        .unstack("time")
+    )
+    xr.testing.assert_identical(result, expected)
+    assert (result["var1"].chunks is not None) == chunked
+
+
+@pytest.mark.parametrize(
+    "bbox, message",
+    [
+        ((10, 45, 0, 55), "xmax should be larger than xmin"),
+        ((0, 55, 10, 45), "ymax should be larger than ymin"),
+        ((-190, 45, 10, 55), "Longitudes should be in"),
+        ((0, 45, 10, 95), "Latitudes should be in"),
+    ],
+)
+def test_named_area_invalid_bbox(bbox, message):
+    with pytest.raises(ValidationError, match=message):
+        NamedArea(name="invalid", bbox=bbox)